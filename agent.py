@@ -2,147 +2,196 @@ import dbus
 import dbus.service
 from libraries.bluetooth import constants
 
+_UINT32_ZERO = dbus.UInt32(0)
+
+
+class Rejected(dbus.DBusException):
+    """Error returned to BlueZ when the user rejects a pairing request."""
+    _dbus_error_name = "org.bluez.Error.Rejected"
+
+
+class Canceled(dbus.DBusException):
+    """Error returned to BlueZ when the user cancels a pairing request."""
+    _dbus_error_name = "org.bluez.Error.Canceled"
+
 
 class Agent(dbus.service.Object):
     """D-Bus Bluetooth Agent implementation for handling pairing requests."""
 
+    __slots__ = ("ui_callback", "log", "_introspection_xml")
+
     def __init__(self, bus, path, ui_callback, log):
         """Initializes the Agent Object.
 
         Args:
              bus: D-Bus Connection to register the agent.
              path: Object path for the D-Bus object.
-             ui_callback: Callback function to interact with the UI.
+             ui_callback: Callback function to interact with the UI. It is called with a `reply` keyword
+                 argument and must invoke it with the user's response instead of returning it.
              log: Logger instance.
         """
         super().__init__(bus, path)
         self.ui_callback = ui_callback
         self.log = log
+        self._introspection_xml = {}
 
-    @dbus.service.method(constants.agent, in_signature="o", out_signature="s")
-    def RequestPinCode(self, device):
-        """Request a PIN code for pairing.
+    @dbus.service.method(dbus.INTROSPECTABLE_IFACE, in_signature="", out_signature="s",
+                         path_keyword="object_path", connection_keyword="connection")
+    def Introspect(self, object_path, connection):
+        """Return the introspection XML of the agent, generating it only once per object path.
 
         Args:
-            device: D-Bus object path of the remote  device.
+            object_path: Object path the introspection request was sent to.
+            connection: D-Bus connection the request arrived on.
 
         Returns:
-            Pin entered by user or False.
+            Introspection XML describing the agent interface.
         """
-        pin = self.ui_callback("pin", device)
-        if pin:
-            self.log.info("RequestPinCode reply = %s", pin)
-            return pin
-        else:
-            self.log.info("User rejected or did not provide PIN for %s", device)
-            return False
-
-    @dbus.service.method(constants.agent, in_signature="o", out_signature="u")
-    def RequestPasskey(self, device):
+        xml = self._introspection_xml.get(object_path)
+        if xml is None:
+            xml = self._introspection_xml[object_path] = super().Introspect(object_path, connection)
+        return xml
+
+    @dbus.service.method(constants.agent, in_signature="o", out_signature="s",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def RequestPinCode(self, device, reply_handler, error_handler):
+        """Request a PIN code for pairing.
+
+        Args:
+            device: D-Bus object path of the remote  device.
+            reply_handler: Sends the PIN entered by the user back to BlueZ.
+            error_handler: Sends an error back to BlueZ if no PIN was provided.
+        """
+        def on_response(pin):
+            if pin:
+                self.log.info("RequestPinCode reply = %s", pin)
+                try:
+                    reply_handler(pin)
+                except (TypeError, ValueError) as error:
+                    self.log.error("Invalid PIN for %s: %s", device, error)
+                    error_handler(Canceled("Invalid PIN"))
+            else:
+                self.log.info("User rejected or did not provide PIN for %s", device)
+                error_handler(Canceled("PIN request cancelled"))
+
+        self.ui_callback("pin", device, reply=on_response)
+
+    @dbus.service.method(constants.agent, in_signature="o", out_signature="u",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def RequestPasskey(self, device, reply_handler, error_handler):
         """Request a numeric passkey for pairing.
 
         Args:
             device: D-Bus object path of the remote device.
-
-        Returns:
-            Passkey entered by the user or False.
+            reply_handler: Sends the passkey entered by the user back to BlueZ.
+            error_handler: Sends an error back to BlueZ if no passkey was provided.
         """
-        passkey = self.ui_callback("passkey", device)
-        if passkey is not None:
-            self.log.info("RequestPasskey reply = %s", passkey)
-            return dbus.UInt32(passkey)
-        else:
-            self.log.info("User rejected or did not provide passkey for %s", device)
-            return False
-
-    @dbus.service.method(constants.agent, in_signature="ou", out_signature="")
-    def RequestConfirmation(self, device, passkey):
+        def on_response(passkey):
+            if passkey is not None:
+                self.log.info("RequestPasskey reply = %s", passkey)
+                try:
+                    reply_handler(_UINT32_ZERO if passkey == 0 else dbus.UInt32(passkey))
+                except (TypeError, ValueError, OverflowError) as error:
+                    self.log.error("Invalid passkey for %s: %s", device, error)
+                    error_handler(Canceled("Invalid passkey"))
+            else:
+                self.log.info("User rejected or did not provide passkey for %s", device)
+                error_handler(Canceled("Passkey request cancelled"))
+
+        self.ui_callback("passkey", device, reply=on_response)
+
+    @dbus.service.method(constants.agent, in_signature="ou", out_signature="",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def RequestConfirmation(self, device, passkey, reply_handler, error_handler):
         """Request confirmation of a displayed passkey from the user.
 
         Args:
             device: D-Bus object path of the remote device.
             passkey: Passkey displayed for verification.
-
-        Returns:
-            False if rejected by user.
+            reply_handler: Confirms the pairing to BlueZ.
+            error_handler: Sends an error back to BlueZ if rejected by user.
         """
-        response = self.ui_callback("confirm", device, passkey)
-        self.log.info("RequestConfirmation response = %s", response)
-        if response:
-            self.log.info("User confirmed pairing with %s", device)
-            return
-        else:
-            self.log.info("User rejected pairing with %s", device)
-            return False
-
-    @dbus.service.method(constants.agent, in_signature="os", out_signature="")
-    def AuthorizeService(self, device, uuid):
+        def on_response(response):
+            self.log.info("RequestConfirmation response = %s", response)
+            if response:
+                self.log.info("User confirmed pairing with %s", device)
+                try:
+                    reply_handler()
+                except dbus.DBusException as error:
+                    self.log.error("Failed to confirm pairing with %s: %s", device, error)
+                    error_handler(Rejected("Pairing confirmation failed"))
+            else:
+                self.log.info("User rejected pairing with %s", device)
+                error_handler(Rejected("Pairing confirmation rejected"))
+
+        self.ui_callback("confirm", device, passkey, reply=on_response)
+
+    @dbus.service.method(constants.agent, in_signature="os", out_signature="",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def AuthorizeService(self, device, uuid, reply_handler, error_handler):
         """Request authorization from the user for a specific Bluetooth service.
 
         Args:
             device: D-Bus object path of remote device.
             uuid: UUID of the service requiring authorization.
-
-        Returns:
-            False if rejected by user.
+            reply_handler: Authorizes the service to BlueZ.
+            error_handler: Sends an error back to BlueZ if rejected by user.
         """
-        response = self.ui_callback("authorize", device, uuid)
-        if response:
-            self.log.info("User authorized service %s for device %s", uuid, device)
-        else:
-            self.log.info("User denied service %s for device %s", uuid, device)
-            return False
-
-    @dbus.service.method(constants.agent, in_signature="ouq", out_signature="")
-    def DisplayPasskey(self, device, passkey, entered):
+        def on_response(response):
+            if response:
+                self.log.info("User authorized service %s for device %s", uuid, device)
+                try:
+                    reply_handler()
+                except dbus.DBusException as error:
+                    self.log.error("Failed to authorize service %s for device %s: %s", uuid, device, error)
+                    error_handler(Rejected("Service authorization failed"))
+            else:
+                self.log.info("User denied service %s for device %s", uuid, device)
+                error_handler(Rejected("Service authorization rejected"))
+
+        self.ui_callback("authorize", device, uuid, reply=on_response)
+
+    @dbus.service.method(constants.agent, in_signature="ouq", out_signature="",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def DisplayPasskey(self, device, passkey, entered, reply_handler, error_handler):
         """Display a passkey to the user during pairing.
 
         Args:
             device: D-Bus object path of the remote device.
             passkey: Passkey to be displayed.
             entered: Number of digits entered so far.
-
-        Returns:
-            False if rejected by user.
+            reply_handler: Acknowledges the request to BlueZ.
+            error_handler: Unused, there is nothing for the user to reject.
         """
-        response = self.ui_callback("display_passkey", device, passkey=passkey, entered=entered)
-        if response:
-            self.log.info("Displayed passkey for %s successfully", device)
-        else:
-            self.log.info("User rejected confirmation for %s", device)
-            return False
-
-    @dbus.service.method(constants.agent, in_signature="os", out_signature="")
-    def DisplayPinCode(self, device, pincode):
+        reply_handler()
+        self.log.info("Displaying passkey for %s", device)
+        self.ui_callback("display_passkey", device, passkey=passkey, entered=entered, reply=lambda response: None)
+
+    @dbus.service.method(constants.agent, in_signature="os", out_signature="",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def DisplayPinCode(self, device, pincode, reply_handler, error_handler):
         """Display a PIN code to the user during pairing.
 
         Args:
             device: D-Bus Object path of the remote device.
             pincode: The pincode to display.
-
-        Returns:
-            False if rejected by user.
+            reply_handler: Acknowledges the request to BlueZ.
+            error_handler: Unused, there is nothing for the user to reject.
         """
-        response = self.ui_callback("display_pin", device, uuid=pincode)
-        if response:
-            self.log.info("PIN displayed to user for %s", device)
-        else:
-            self.log.info("User rejected PIN display for %s", device)
-            return False
-
-    @dbus.service.method(constants.agent, in_signature="o", out_signature="")
-    def Cancel(self, device):
+        reply_handler()
+        self.log.info("Displaying PIN for %s", device)
+        self.ui_callback("display_pin", device, uuid=pincode, reply=lambda response: None)
+
+    @dbus.service.method(constants.agent, in_signature="o", out_signature="",
+                         async_callbacks=("reply_handler", "error_handler"))
+    def Cancel(self, device, reply_handler, error_handler):
         """Handle cancellation of the pairing process.
 
         Args:
             device: D-Bus Object path of remote device.
-
-        Returns:
-            False if rejected by user.
+            reply_handler: Acknowledges the cancellation to BlueZ.
+            error_handler: Unused, BlueZ defines no errors for Cancel.
         """
-        response = self.ui_callback("cancel", device)
-        if response:
-            self.log.info("User cancelled the pairing for %s", device)
-        else:
-            self.log.warning("UI callback for cancel failed or returned None for device: %s", device)
-            return False
+        reply_handler()
+        self.log.info("Pairing with %s was cancelled", device)
+        self.ui_callback("cancel", device, reply=lambda response: None)
@@ -1,42 +1,105 @@
-def register_pairing_status_callback(self, status_update_handler):
-    """
-    Registers a handler to receive Bluetooth pairing status updates via D-Bus signals.
-
-    This sets up a listener for the 'PropertiesChanged' signal on the 'org.bluez.Device1' interface.
-    When the 'Paired' property changes (either paired or unpaired), the provided handler is called.
-
-    Args:
-        status_update_handler (function): A callable that accepts two arguments:
-            - device_address (str): The Bluetooth address of the device.
-            - paired (bool): True if the device is now paired, False if unpaired or pairing failed.
-    """
-    self.pairing_status_callback = status_update_handler
-    self.bus.add_signal_receiver(
-        self._on_properties_changed,
-        dbus_interface="org.freedesktop.DBus.Properties",
-        signal_name="PropertiesChanged",
-        arg0="org.bluez.Device1",
-        path_keyword="path"
-    )
-def on_properties_changed(self, interface, changed, invalidated, path):
-    if interface != "org.bluez.Device1" or "Paired" not in changed:
-        return
-    paired = changed["Paired"]
-    device_address = path.split("dev_")[-1].replace("_", ":")
-    if hasattr(self, "pairing_status_callback") and callable(self.pairing_status_callback):
-        self.pairing_status_callback(device_address, paired)
-
-
-
-def setup_dbus_signals(self):
-    self.bluetooth_device_manager.setup_pairing_signal_listener(self.handle_pairing_status_update)
-
-def handle_pairing_status_update(self, device_address, paired):
-    if paired:
-        self.log.info(f"[Signal] Device paired: {device_address}")
-        self.add_paired_device_to_list(device_address)
-        QMessageBox.information(self, "Pairing Successful", f"{device_address} was paired successfully.")
-    else:
-        self.log.info(f"[Signal] Pairing failed or device unpaired: {device_address}")
-        QMessageBox.warning(self, "Pairing Failed", f"Pairing with {device_address} failed.")
-        self.remove_device_from_list(device_address)
+from functools import lru_cache
+
+from gi.repository import GLib
+
+_PAIRING_UPDATE_INTERVAL_MS = 100
+_DEVICE_PATH_SEPARATOR = "/dev_"
+_ADDRESS_TRANSLATION = str.maketrans("_", ":")
+
+
+@lru_cache(maxsize=256)
+def _addr_from_path(path):
+    """Returns the Bluetooth address encoded in a BlueZ device object path."""
+    return path.rpartition(_DEVICE_PATH_SEPARATOR)[2].translate(_ADDRESS_TRANSLATION)
+
+
+class PairingSignalRouter:
+    """Shares one Device1 PropertiesChanged match between every pairing status subscriber."""
+
+    _instance = None
+
+    def __init__(self, bus, log):
+        """Initializes the router.
+
+        Args:
+            bus: D-Bus connection the signal receiver is installed on.
+            log: Logger instance.
+        """
+        self.bus = bus
+        self.log = log
+        self._subscribers = []
+        self._pending_pairing_updates = {}
+        self._pairing_drain_source = None
+        self._signal_match = None
+
+    @classmethod
+    def instance(cls, bus, log):
+        """Returns the process-wide router, creating it on first use.
+
+        Args:
+            bus: D-Bus connection the router listens on.
+            log: Logger instance used if the router has to be created.
+
+        Raises:
+            ValueError: If the router already listens on a different connection.
+        """
+        if cls._instance is None:
+            cls._instance = cls(bus, log)
+        elif cls._instance.bus is not bus:
+            raise ValueError("PairingSignalRouter is already bound to another D-Bus connection")
+        return cls._instance
+
+    def subscribe(self, status_update_handler):
+        """Adds a pairing status handler, installing the signal receiver on the first subscription.
+
+        Args:
+            status_update_handler: Callable accepting the device address and the new Paired value.
+        """
+        if status_update_handler not in self._subscribers:
+            self._subscribers.append(status_update_handler)
+        if self._signal_match is None:
+            self._signal_match = self.bus.add_signal_receiver(
+                self.on_properties_changed,
+                dbus_interface="org.freedesktop.DBus.Properties",
+                signal_name="PropertiesChanged",
+                bus_name="org.bluez",
+                arg0="org.bluez.Device1",
+                path_keyword="path"
+            )
+
+    def unsubscribe(self, status_update_handler):
+        """Removes a pairing status handler, dropping the signal receiver once no subscribers are left.
+
+        Args:
+            status_update_handler: A handler previously passed to subscribe.
+        """
+        if status_update_handler in self._subscribers:
+            self._subscribers.remove(status_update_handler)
+        if not self._subscribers and self._signal_match is not None:
+            self._signal_match.remove()
+            self._signal_match = None
+
+    def on_properties_changed(self, interface, changed, invalidated, path):
+        """Records the new Paired value of a device and schedules its delivery."""
+        if interface != "org.bluez.Device1" or "Paired" not in changed:
+            return
+        device_address = _addr_from_path(path)
+        self._pending_pairing_updates[device_address] = changed["Paired"]
+        if self._pairing_drain_source is None:
+            self._pairing_drain_source = GLib.timeout_add(_PAIRING_UPDATE_INTERVAL_MS, self._drain_pairing_updates)
+
+    def _drain_pairing_updates(self):
+        """Delivers the latest pairing state of every device that changed since the last tick.
+
+        Returns:
+            False, so the GLib timeout is not repeated.
+        """
+        self._pairing_drain_source = None
+        pending, self._pending_pairing_updates = self._pending_pairing_updates, {}
+        for device_address, paired in pending.items():
+            for callback in list(self._subscribers):
+                try:
+                    callback(device_address, paired)
+                except Exception as error:
+                    self.log.error("Pairing status handler failed for %s: %s", device_address, error)
+        return False
@@ -31,6 +31,7 @@ from PyQt6.QtWidgets import QVBoxLayout
 from PyQt6.QtWidgets import QWidget
 
 import style_sheet as styles
+from bluez import PairingSignalRouter
 from libraries.bluetooth import constants
 from libraries.bluetooth.bluez import BluetoothDeviceManager
 from Utils.utils import get_controller_interface_details
@@ -54,6 +55,7 @@ class TestApplication(QWidget):
             hcidump_log_name: Name of hcidump log file.
         """
         super().__init__()
+        DBusGMainLoop(set_as_default=True)
         self.bus=dbus.SystemBus()
         self.interface = interface
         self.log_path = log.log_path
@@ -76,35 +78,38 @@ class TestApplication(QWidget):
         self.device_tab_widget = None
         self.grid = None
         self.refresh_button = None
+        self.pairing_success_box = QMessageBox(QMessageBox.Icon.Information, "Pairing Successful", "", QMessageBox.StandardButton.Ok, self)
+        self.pairing_failure_box = QMessageBox(QMessageBox.Icon.Warning, "Pairing Failed", "", QMessageBox.StandardButton.Ok, self)
         self.setup_dbus_signals()
         self.initialize_host_ui()
 
 
     def setup_dbus_signals(self):
-        DBusGMainLoop(set_as_default=True)
-        self.bus.add_signal_receiver(
-            self.on_properties_changed,
-            dbus_interface="org.freedesktop.DBus.Properties",
-            signal_name="PropertiesChanged",
-            arg0="org.bluez.Device1",
-            path_keyword="path"
-        )
-
-    def on_properties_changed(self, interface, changed, invalidated, path):
-        if interface != "org.bluez.Device1" or "Paired" not in changed:
-            return
-
-        paired = changed["Paired"]
-        device_address = path.split("dev_")[-1].replace("_", ":")
+        router = PairingSignalRouter.instance(self.bus, self.log)
+        router.subscribe(self.handle_pairing_status_update)
+        self.destroyed.connect(lambda: router.unsubscribe(self.handle_pairing_status_update))
 
+    def handle_pairing_status_update(self, device_address, paired):
         if paired:
-            self.log.info(f"[Signal] Device paired: {device_address}")
+            self.log.info("[Signal] Device paired: %s", device_address)
             self.add_paired_device_to_list(device_address)
-            QMessageBox.information(self, "Pairing Successful", f"{device_address} was paired successfully.")
+            self.show_pairing_result(self.pairing_success_box, f"{device_address} was paired successfully.")
         else:
-            self.log.info(f"[Signal] Pairing failed or device unpaired: {device_address}")
-            QMessageBox.warning(self, "Pairing Failed", f"Pairing with {device_address} failed.")
+            self.log.info("[Signal] Pairing failed or device unpaired: %s", device_address)
             self.remove_device_from_list(device_address)
+            self.show_pairing_result(self.pairing_failure_box, f"Pairing with {device_address} failed.")
+
+    def show_pairing_result(self, message_box, message):
+        """Shows a pairing result in a pooled message box, appending it if the box is still open.
+
+        Args:
+            message_box: The pooled message box for the result's severity.
+            message: Text describing the pairing result of one device.
+        """
+        if message_box.isVisible():
+            message = f"{message_box.text()}\n{message}"
+        message_box.setText(message)
+        message_box.open()
 
     def load_paired_devices(self):
         """Loads and displays all paired Bluetooth devices into the profiles list widget."""
@@ -731,7 +736,7 @@ class TestApplication(QWidget):
             warning_label.setStyleSheet(styles.color_style_sheet)
             self.clear_layout(self.profile_methods_layout)
             self.profile_methods_layout.addWidget(warning_label)
-            self.add_device_connection_controls(self.profile_methods_layout, device_address)
+            self.add_device_connection_controls(self.profile_methods_layout, device_address, is_connected)
             return
         self.device_tab_widget = QTabWidget()
         self.device_tab_widget.setMaximumWidth(600)
@@ -747,20 +752,20 @@ class TestApplication(QWidget):
         self.clear_layout(self.profile_methods_layout)
         self.profile_methods_layout.addWidget(self.device_tab_widget)
         self.handle_profile_tab_change(self.device_tab_widget.currentIndex())
-        self.add_device_connection_controls(self.profile_methods_layout, device_address)
+        self.add_device_connection_controls(self.profile_methods_layout, device_address, is_connected)
 
-    def add_device_connection_controls(self, layout, device_address):
+    def add_device_connection_controls(self, layout, device_address, is_connected):
         """Adds Connect, Disconnect, and Unpair buttons to the provided layout for the specified device.
 
         Args:
             layout: The layout to which the control buttons will be added.
             device_address: The Bluetooth address of the device the controls apply to.
+            is_connected: Whether the device is currently connected.
         """
         bold_font = QFont()
         bold_font.setBold(True)
         button_layout = QHBoxLayout()
-        self.is_connected = self.bluetooth_device_manager.is_device_connected(device_address)
-        self.is_paired = device_address in self.bluetooth_device_manager.get_paired_devices()
+        self.is_connected = is_connected
         self.connect_button = QPushButton("Connect")
         self.connect_button.setFont(bold_font)
         self.connect_button.setStyleSheet(styles.bluetooth_profiles_button_style)
@@ -801,15 +806,15 @@ class TestApplication(QWidget):
         result = method(device_address)
         self.log.info("Performing %s on %s", method_name, device_address)
         if result:
-            self.log.info(f"{device_address}: Device {action} successful.")
+            self.log.info("%s: Device %s successful.", device_address, action)
         else:
-            self.log.info(f"{device_address}: Device {action} failed.")
+            self.log.info("%s: Device %s failed.", device_address, action)
         response_handler = getattr(self, response_handler)
         if action == "connect" and load_profiles:
             response_handler(device_address)
         elif action=="disconnect" or action=="unpair":
             response_handler(device_address)
-        elif action=="pair" and self.bluetooth_device_manager.is_device_paired(device_address):
+        elif action=="pair" and result:
             response_handler(device_address)
 
     def remove_device_from_list(self, unpaired_device_address):
@@ -1110,29 +1115,50 @@ class TestApplication(QWidget):
             self.log.error("Failed to unregister agent: %s", error)
             QMessageBox.critical(self, "Unregistration Failed", f"Could not unregister agent.")
 
-    def handle_pairing_request(self, request_type, device, uuid=None, passkey=None):
+    def handle_pairing_request(self, request_type, device, uuid=None, passkey=None, entered=None, reply=None):
         """Handle various incoming Bluetooth pairing requests and user interactions.
 
+        When `reply` is given the dialog is shown from the Qt event loop after the D-Bus method handler
+        has returned, and the user's response is passed to `reply` instead of being returned. If the
+        handler raises, `reply` receives None so BlueZ gets an answer instead of waiting for its timeout.
+        A Cancel from BlueZ does not close a dialog that is already open; its answer is still passed to
+        `reply` even though BlueZ has dropped the request.
+
         Args:
             request_type: The type of pairing request.
             device: The D-Bus object path of the Bluetooth device.
             uuid: The UUID of the Bluetooth service or PIN to display.
             passkey: The passkey for confirmation or display.
+            entered: Number of passkey digits entered so far on the remote device.
+            reply: Optional callable receiving the user's response.
 
         Returns:
             PIN , Passkey, True, or None based on request type and user interaction.
         """
-        self.log.info(f"Handling pairing request: {request_type} for {device}")
+        self.log.info("Handling pairing request: %s for %s", request_type, device)
         device_address = device.split("dev_")[-1].replace("_", ":")
         #if self.selected_capability == "NoInputNoOutput" and self.bluetooth_device_manager.is_device_paired(device_address):
           #  self.add_paired_device_to_list(device_address)
           #  self.log.info("Pairing successful with %s", device_address)
         handler_name = constants.pairing_request_handlers.get(request_type)
         if not handler_name:
-            self.log.warning(f"Unknown pairing request type: {request_type}")
+            self.log.warning("Unknown pairing request type: %s", request_type)
+            if reply is not None:
+                reply(None)
             return None
         handler = getattr(self, handler_name)
-        return handler(device_address, uuid, passkey)
+        if reply is None:
+            return handler(device_address, uuid, passkey)
+
+        def respond():
+            try:
+                response = handler(device_address, uuid, passkey)
+            except Exception as error:
+                self.log.error("Failed to handle pairing request %s for %s: %s", request_type, device_address, error)
+                response = None
+            reply(response)
+
+        QTimer.singleShot(0, respond)
 
     def handle_pin_request(self, device_address, uuid=None, passkey=None):
         """Handle PIN code input from the user for pairing.
@@ -1159,12 +1185,13 @@ class TestApplication(QWidget):
             passkey: The passkey for confirmation or display.
 
         Returns:
-            passkey_value: The passkey entered by the user, or False if cancelled.
+            passkey_value: The passkey entered by the user, or None if cancelled.
         """
-        passkey_value, user_response = QInputDialog.getInt(self, "Pairing Request", f"Enter passkey for device {device_address}:")
+        passkey_value, user_response = QInputDialog.getInt(self, "Pairing Request", f"Enter passkey for device {device_address}:",
+                                                              0, 0, 999999)
         if not user_response:
             self.log.info("User cancelled passkey input for device %s", device_address)
-            return False
+            return None
         #QMessageBox.information(self, "Pairing Successful", f"{device_address} was paired.")
         #self.add_paired_device_to_list(device_address)
         return passkey_value
@@ -1220,7 +1247,7 @@ class TestApplication(QWidget):
             label: The label to display ('PIN' or 'Passkey').
         """
         if value is None:
-            self.log.warning(f"{label} requested but no value provided for device {device_address}.")
+            self.log.warning("%s requested but no value provided for device %s.", label, device_address)
             return
         QMessageBox.information(self, f"Display {label}", f"Enter this {label.lower()} on {device_address}: {value}")
 